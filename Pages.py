@@ -1,91 +1,376 @@
+import json
+import os
+
+from selenium.common.exceptions import JavascriptException
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.common.keys import Keys
 
+# Locator that last matched for each element, so later runs try it first
+KNOWN_LOCATORS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "global_locators.json")
+
+# Runs a script body against named elements. arguments[0] maps each element name to its
+# [by, value] candidates, tried in order as UrbanRoutesPage._find does; the body sees the
+# located elements as `els` and the remaining arguments as `args`. Returns {missing: name}
+# if an element has no match, else the candidate used per element and the body's result.
+LOCATE_ELEMENTS_JS = """
+function findOne(by, value) {
+    if (by === 'id') {
+        return document.getElementById(value);
+    } else if (by === 'css selector') {
+        return document.querySelector(value);
+    } else if (by === 'class name') {
+        return document.getElementsByClassName(value)[0];
+    } else if (by === 'xpath') {
+        return document.evaluate(value, document, null,
+                                 XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    return null;
+}
+var candidatesByName = arguments[0], args = Array.prototype.slice.call(arguments, 1);
+var els = {}, matched = {};
+for (var name in candidatesByName) {
+    var candidates = candidatesByName[name];
+    for (var i = 0; i < candidates.length && !els[name]; i++) {
+        var el = findOne(candidates[i][0], candidates[i][1]);
+        if (el) {
+            els[name] = el;
+            matched[name] = candidates[i];
+        }
+    }
+    if (!els[name]) {
+        return {missing: name};
+    }
+}
+"""
+
+# Sets an input's value through the native setter so React picks it up, then fires input/change
+SET_VALUE_JS = """
+function setValue(el, value) {
+    var setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+    setter.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+"""
+
+
+def page_script(body):
+    return (LOCATE_ELEMENTS_JS + "return {matched: matched, value: (function (els, args) {"
+            + SET_VALUE_JS + body + "})(els, args)};")
+
+
+# Fills both card fields in one round-trip and blurs the code field to trigger validation.
+# The Add button is checked from Python afterwards, once React has had a chance to re-render.
+FILL_CARD_JS = page_script("""
+setValue(els.card_number_field, args[0]);
+setValue(els.card_code_field, args[1]);
+els.card_code_field.dispatchEvent(new FocusEvent('focusout', {bubbles: true}));
+""")
+
+TYPE_FAST_JS = SET_VALUE_JS + "setValue(arguments[0], arguments[1]);"
+
+SET_ADDRESSES_JS = page_script("""
+setValue(els.from_field, args[0]);
+setValue(els.to_field, args[1]);
+""")
+
+GET_ADDRESSES_JS = page_script("return [els.from_field.value, els.to_field.value];")
+
+ADD_ICE_CREAM_JS = page_script("""
+for (var i = 0; i < args[0]; i++) {
+    els.ice_cream_counter_plus.click();
+}
+""")
+
+
+def load_known_locators():
+    try:
+        with open(KNOWN_LOCATORS_FILE) as f:
+            return {name: tuple(locator) for name, locator in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def update_known_locator(name, locator):
+    # Merge into what is on disk so parallel workers don't drop each other's entries;
+    # a locator of None removes the entry
+    known = load_known_locators()
+    if locator is None:
+        known.pop(name, None)
+    else:
+        known[name] = locator
+    # Write then rename, so parallel workers never read a half-written file
+    tmp_path = f"{KNOWN_LOCATORS_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(known, f, indent=2)
+    os.replace(tmp_path, KNOWN_LOCATORS_FILE)
+
+
 class UrbanRoutesPage:
+    # All locators grouped together: each element maps to candidates tried in order,
+    # the original selector first and looser fallbacks after it
+    PATTERNS = {
+        "from_field": [(By.ID, "from")],
+        "to_field": [(By.ID, "to")],
+        "phone_field": [(By.ID, "phone")],
+        "code_field": [(By.ID, "code")],
+        "call_taxi_button": [
+            (By.XPATH, "//button[text()='Call a taxi']"),
+            (By.XPATH, "//button[normalize-space()='Call a taxi']"),
+        ],
+        "supportive_plan_button": [
+            (By.XPATH, "//div[text()='Supportive']"),
+            (By.XPATH, "//div[normalize-space()='Supportive']"),
+        ],
+        "active_plan_title": [
+            (By.CSS_SELECTOR, "div.tcard.active div.tcard-title"),
+            (By.XPATH, "//div[contains(@class, 'tcard') and contains(@class, 'active')]"
+                       "//div[contains(@class, 'tcard-title')]"),
+        ],
+        "payment_method_button": [
+            (By.CLASS_NAME, "pp-button"),
+            (By.XPATH, "//div[contains(@class, 'pp-button')]"),
+        ],
+        "add_card_button": [
+            (By.XPATH, "//div[text()='Add card']"),
+            (By.XPATH, "//div[normalize-space()='Add card']"),
+        ],
+        "card_number_field": [(By.ID, "number")],
+        "card_code_field": [(By.CSS_SELECTOR, "input[placeholder='12']")],
+        "add_card_submit": [
+            (By.XPATH, "//button[text()='Add']"),
+            (By.XPATH, "//button[normalize-space()='Add']"),
+        ],
+        "close_payment_modal": [(By.CSS_SELECTOR, "button.close-button.section-close")],
+        "message_field": [(By.ID, "comment")],
+        "blanket_checkbox": [
+            (By.CSS_SELECTOR, "div.r-sw div.switch"),
+            (By.XPATH, "//div[contains(@class, 'r-sw')]//div[contains(@class, 'switch')]"),
+        ],
+        "ice_cream_counter_plus": [
+            (By.CSS_SELECTOR, "div.counter-plus"),
+            (By.XPATH, "//div[contains(@class, 'counter-plus')]"),
+        ],
+        "ice_cream_counter_value": [
+            (By.CSS_SELECTOR, "div.counter-value"),
+            (By.XPATH, "//div[contains(@class, 'counter-value')]"),
+        ],
+        "car_search_modal": [
+            (By.CLASS_NAME, "order-header-title"),
+            (By.XPATH, "//div[contains(@class, 'order-header-title')]"),
+        ],
+        "next_button": [
+            (By.XPATH, "//button[text()='Next']"),
+            (By.XPATH, "//button[normalize-space()='Next']"),
+        ],
+        "confirm_button": [
+            (By.XPATH, "//button[text()='Confirm']"),
+            (By.XPATH, "//button[normalize-space()='Confirm']"),
+        ],
+    }
+
     def __init__(self, driver):
         self.driver = driver
+        # Located elements keyed by element name, so repeated actions on a field skip find_element
+        self._cache = {}
+        self._known = load_known_locators()
+        # Polling faster than the 0.5s default cuts the lag between an element appearing and the click
+        self._wait = WebDriverWait(driver, 10, poll_frequency=0.1)
+        self._long_wait = WebDriverWait(driver, 40, poll_frequency=0.25)
+        # Bounds how long a script-filled form may take to validate before falling back to keystrokes
+        self._short_wait = WebDriverWait(driver, 2, poll_frequency=0.1)
+
+    def open(self, url):
+        self.driver.get(url)
+        self.reset_cache()
+        # Eager page loads return at DOMContentLoaded, possibly before the app has drawn its inputs
+        self._wait_for("from_field", self._wait, clickable=True)
+
+    def reset_cache(self):
+        self._cache.clear()
 
-    # All locators grouped together
-    from_field = (By.ID, "from")
-    to_field = (By.ID, "to")
-    phone_field = (By.ID, "phone")
-    code_field = (By.ID, "code")
-    call_taxi_button = (By.XPATH, "//button[text()='Call a taxi']")
-    supportive_plan_button = (By.XPATH, "//div[text()='Supportive']")
-    payment_method_button = (By.CLASS_NAME, "pp-button")
-    add_card_button = (By.XPATH, "//div[text()='Add card']")
-    card_number_field = (By.ID, "number")
-    card_code_field = (By.XPATH, "//input[@placeholder='12']")
-    add_card_submit = (By.XPATH, "//button[text()='Add']")
-    close_payment_modal = (By.XPATH, "//button[@class='close-button section-close']")
-    message_field = (By.ID, "comment")
-    blanket_checkbox = (By.XPATH, "//div[@class='r-sw']//div[@class='switch']")
-    ice_cream_counter_plus = (By.XPATH, "//div[@class='counter-plus']")
-    car_search_modal = (By.CLASS_NAME, "order-header-title")
-    next_button = (By.XPATH, "//button[text()='Next']")
-    confirm_button = (By.XPATH, "//button[text()='Confirm']")
+    def _candidates(self, name):
+        candidates = self.PATTERNS[name]
+        known = self._known.get(name)
+        if known in candidates:
+            return [known] + [locator for locator in candidates if locator != known]
+        return candidates
+
+    def _remember(self, name, locator):
+        # Only fallbacks are worth persisting; the default locator is tried first anyway
+        if locator == self.PATTERNS[name][0]:
+            if name in self._known:
+                del self._known[name]
+                update_known_locator(name, None)
+        elif self._known.get(name) != locator:
+            self._known[name] = locator
+            update_known_locator(name, locator)
+
+    def _not_found(self, name):
+        return NoSuchElementException(f"No locator matched '{name}': {self.PATTERNS[name]}")
+
+    def _find(self, name):
+        for locator in self._candidates(name):
+            try:
+                element = self.driver.find_element(*locator)
+            except NoSuchElementException:
+                continue
+            self._remember(name, locator)
+            return element
+        raise self._not_found(name)
+
+    def _run(self, script, names, *args):
+        # Runs a page_script, recording which candidate matched each element in the browser
+        result = self.driver.execute_script(script, {name: self._candidates(name) for name in names}, *args)
+        if "missing" in result:
+            raise self._not_found(result["missing"])
+        for name, locator in result["matched"].items():
+            self._remember(name, tuple(locator))
+        return result["value"]
+
+    def _el(self, name):
+        element = self._cache.get(name)
+        if element is None:
+            element = self._cache[name] = self._find(name)
+        return element
+
+    def _call(self, name, method, *args):
+        # Re-locate once if the cached element was detached from the DOM
+        try:
+            return getattr(self._el(name), method)(*args)
+        except StaleElementReferenceException:
+            self._cache.pop(name, None)
+            return getattr(self._el(name), method)(*args)
+
+    def _type_fast(self, name, text):
+        # One script call instead of a key event per character; not for fields that validate on keydown
+        try:
+            self.driver.execute_script(TYPE_FAST_JS, self._el(name), text)
+        except StaleElementReferenceException:
+            self._cache.pop(name, None)
+            self.driver.execute_script(TYPE_FAST_JS, self._el(name), text)
+
+    @staticmethod
+    def _is_ready(element, clickable):
+        return element.is_displayed() and (not clickable or element.is_enabled())
+
+    def _wait_for(self, name, wait, clickable):
+        # Poll only the preferred locator, so waiting costs one find_element per poll
+        preferred = self._candidates(name)[0]
+
+        def ready(driver):
+            try:
+                element = driver.find_element(*preferred)
+                if self._is_ready(element, clickable):
+                    return element
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+            return False
+
+        try:
+            element = wait.until(ready)
+        except TimeoutException:
+            # The preferred locator never became ready; give the fallbacks one try
+            element = self._find(name)
+            if not self._is_ready(element, clickable):
+                raise
+        else:
+            self._remember(name, preferred)
+        self._cache[name] = element
+        return element
+
+    def _click(self, name):
+        self._wait_for(name, self._wait, clickable=True).click()
 
     def get_from_address(self):
-        return self.driver.find_element(*self.from_field).get_attribute("value")
+        return self._call("from_field", "get_attribute", "value")
 
     def get_to_address(self):
-        return self.driver.find_element(*self.to_field).get_attribute("value")
+        return self._call("to_field", "get_attribute", "value")
+
+    def get_addresses(self):
+        # Both values in one round-trip instead of a find + get_attribute per field
+        from_address, to_address = self._run(GET_ADDRESSES_JS, ["from_field", "to_field"])
+        return from_address, to_address
 
     def set_from_address(self, address):
-        self.driver.find_element(*self.from_field).send_keys(address)
+        self._type_fast("from_field", address)
 
     def set_to_address(self, address):
-        self.driver.find_element(*self.to_field).send_keys(address)
+        self._type_fast("to_field", address)
+
+    def set_addresses(self, from_address, to_address):
+        # The two fields are independent, so both are written in a single round-trip
+        self._run(SET_ADDRESSES_JS, ["from_field", "to_field"], from_address, to_address)
 
     def set_phone_number(self, phone_number):
-        self.driver.find_element(*self.phone_field).send_keys(phone_number)
+        self._call("phone_field", "send_keys", phone_number)
 
     def get_phone_number(self):
-        return self.driver.find_element(*self.phone_field).get_attribute("value")
+        return self._call("phone_field", "get_attribute", "value")
 
     def set_sms_code(self, sms_code):
-        self.driver.find_element(*self.code_field).send_keys(sms_code)
+        self._call("code_field", "send_keys", sms_code)
+
+    def click_next_button(self):
+        self._click("next_button")
+
+    def click_confirm_button(self):
+        self._click("confirm_button")
 
     def click_call_taxi_button(self):
-        wait = WebDriverWait(self.driver, 10)
-        button = wait.until(expected_conditions.element_to_be_clickable(self.call_taxi_button))
-        button.click()
+        self._click("call_taxi_button")
 
     def select_supportive_plan(self):
-        wait = WebDriverWait(self.driver, 10)
-        button = wait.until(expected_conditions.element_to_be_clickable(self.supportive_plan_button))
-        button.click()
+        self._click("supportive_plan_button")
 
-    def click_phone_number_field(self):
-        wait = WebDriverWait(self.driver, 10)
-        button = wait.until(expected_conditions.element_to_be_clickable(self.phone_field))
-        button.click()
+    def get_selected_plan(self):
+        # Not cached: which tariff card is active changes with every selection
+        return self._find("active_plan_title").text
 
-    def fill_phone_number(self, phone_number):
-        self.driver.find_element(*self.phone_field).send_keys(phone_number)
+    def click_phone_number_field(self):
+        self._click("phone_field")
 
     def add_credit_card(self, card_number, card_code):
-        self.driver.find_element(*self.add_card_button).click()
-        self.driver.find_element(*self.card_number_field).send_keys(card_number)
-        self.driver.find_element(*self.card_code_field).send_keys(card_code)
+        self._call("add_card_button", "click")
+        self._wait_for("card_number_field", self._wait, clickable=True)
+        try:
+            self._run(FILL_CARD_JS, ["card_number_field", "card_code_field"], card_number, card_code)
+            submit = self._wait_for("add_card_submit", self._short_wait, clickable=True)
+        except (JavascriptException, TimeoutException):
+            self._type_credit_card(card_number, card_code)
+        else:
+            submit.click()
+        self._click("close_payment_modal")
+
+    def _type_credit_card(self, card_number, card_code):
+        # Keystroke path for when card validation needs real key events
+        self._call("card_number_field", "clear")
+        self._call("card_number_field", "send_keys", card_number)
+        self._call("card_code_field", "clear")
+        self._call("card_code_field", "send_keys", card_code)
         # Press TAB to change focus and trigger validation
-        self.driver.find_element(*self.card_code_field).send_keys(Keys.TAB)
-        wait = WebDriverWait(self.driver, 10)
-        wait.until(expected_conditions.element_to_be_clickable(self.add_card_submit))
-        self.driver.find_element(*self.add_card_submit).click()
-        self.driver.find_element(*self.close_payment_modal).click()
+        self._call("card_code_field", "send_keys", Keys.TAB)
+        self._click("add_card_submit")
 
     def set_message_for_driver(self, message):
-        self.driver.find_element(*self.message_field).send_keys(message)
+        self._type_fast("message_field", message)
 
     def select_blanket_and_handkerchiefs(self):
-        self.driver.find_element(*self.blanket_checkbox).click()
+        self._call("blanket_checkbox", "click")
+
+    def add_ice_cream(self, count=1):
+        # Script clicks skip WebDriver's interactability checks, so wait for the counter first;
+        # the clicks themselves then take one round-trip regardless of count
+        self._wait_for("ice_cream_counter_plus", self._wait, clickable=True)
+        self._run(ADD_ICE_CREAM_JS, ["ice_cream_counter_plus"], count)
 
-    def add_ice_cream(self):
-        self.driver.find_element(*self.ice_cream_counter_plus).click()
+    def get_ice_cream_count(self):
+        return int(self._call("ice_cream_counter_value", "get_attribute", "textContent"))
 
     def wait_for_car_search_modal(self):
-        wait = WebDriverWait(self.driver, 40)
-        wait.until(expected_conditions.visibility_of_element_located(self.car_search_modal))
\ No newline at end of file
+        self._wait_for("car_search_modal", self._long_wait, clickable=False)
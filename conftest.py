@@ -0,0 +1,82 @@
+import pytest
+from selenium import webdriver
+from Pages import UrbanRoutesPage
+import data
+import helpers
+
+
+URL = "https://cnt-2ef36245-39b4-4c16-aeae-5d073dd6c207.containerhub.tripleten-services.com"
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "perf_logs: run the class on a browser that records performance logs")
+
+
+def start_chrome(performance_logs=False):
+    options = webdriver.ChromeOptions()
+    # Return from driver.get at DOMContentLoaded; UrbanRoutesPage.open then waits for the app's inputs
+    options.page_load_strategy = "eager"
+    options.add_argument("--disable-extensions")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    if performance_logs:
+        # we need additional logging enabled in order to retrieve phone confirmation code
+        options.set_capability("goog:loggingPrefs", {'performance': 'ALL'})
+    driver = webdriver.Chrome(options=options)
+    return driver
+
+
+# One Chrome per session (per worker under pytest-xdist), reused by every test class
+@pytest.fixture(scope="session")
+def browser():
+    driver = start_chrome()
+    yield driver
+    driver.quit()
+
+
+# Performance logging makes ChromeDriver buffer every network event, so only classes
+# that read the SMS code from the logs get this browser
+@pytest.fixture(scope="session")
+def perf_browser():
+    driver = start_chrome(performance_logs=True)
+    yield driver
+    driver.quit()
+
+
+# Probed once per session, and failing loudly instead of leaving the browser on a blank page
+@pytest.fixture(scope="session")
+def app_url():
+    assert helpers.is_url_reachable(URL), f"{URL} unreachable"
+    return URL
+
+
+# Hands the warm browser to a class after wiping state left by the previous one
+@pytest.fixture(scope="class")
+def driver(request):
+    marked = request.node.get_closest_marker("perf_logs") is not None
+    browser = request.getfixturevalue("perf_browser" if marked else "browser")
+    browser.delete_all_cookies()
+    # Storage is inaccessible before the first navigation (data: URL), hence the try
+    browser.execute_script(
+        "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+    )
+    return browser
+
+
+@pytest.fixture(scope="class")
+def routes_page(driver, app_url):
+    page = UrbanRoutesPage(driver)
+    page.open(app_url)
+    return page
+
+
+# Brings the page to the "supportive plan selected" state once per class
+@pytest.fixture(scope="class")
+def ride_setup(routes_page):
+    routes_page.set_addresses(data.ADDRESS_FROM, data.ADDRESS_TO)
+    # click_call_taxi_button waits for the button to become clickable once the route is processed
+    routes_page.click_call_taxi_button()
+    routes_page.select_supportive_plan()
+    return routes_page
@@ -17,7 +17,7 @@
 """The WebDriver implementation."""
 import base64
 import contextlib
-import copy
+import functools
 import os
 import pkgutil
 import tempfile
@@ -88,57 +88,40 @@ def _create_caps(caps):
     :Args:
      - caps - A dictionary of capabilities requested by the caller.
     """
-    caps = copy.deepcopy(caps)
-    always_match = {}
-    for k, v in caps.items():
-        always_match[k] = v
-    return {"capabilities": {"firstMatch": [{}], "alwaysMatch": always_match}}
+    return {"capabilities": {"firstMatch": [{}], "alwaysMatch": dict(caps)}}
 
 
-def get_remote_connection(capabilities, command_executor, keep_alive, ignore_local_proxy=False):
+@functools.lru_cache(maxsize=1)
+def _remote_connection_classes():
+    # Imported lazily to avoid a circular import through the selenium.webdriver package
     from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
     from selenium.webdriver.edge.remote_connection import EdgeRemoteConnection
     from selenium.webdriver.firefox.remote_connection import FirefoxRemoteConnection
     from selenium.webdriver.safari.remote_connection import SafariRemoteConnection
 
     candidates = [ChromeRemoteConnection, EdgeRemoteConnection, SafariRemoteConnection, FirefoxRemoteConnection]
-    handler = next((c for c in candidates if c.browser_name == capabilities.get("browserName")), RemoteConnection)
+    return {c.browser_name: c for c in candidates}
 
-    return handler(command_executor, keep_alive=keep_alive, ignore_proxy=ignore_local_proxy)
 
+def get_remote_connection(capabilities, command_executor, keep_alive, ignore_local_proxy=False):
+    handler = _remote_connection_classes().get(capabilities.get("browserName"), RemoteConnection)
 
-def create_matches(options: List[BaseOptions]) -> Dict:
-    capabilities = {"capabilities": {}}
-    opts = []
-    for opt in options:
-        opts.append(opt.to_capabilities())
-    opts_size = len(opts)
-    samesies = {}
-
-    # Can not use bitwise operations on the dicts or lists due to
-    # https://bugs.python.org/issue38210
-    for i in range(opts_size):
-        min_index = i
-        if i + 1 < opts_size:
-            first_keys = opts[min_index].keys()
+    return handler(command_executor, keep_alive=keep_alive, ignore_proxy=ignore_local_proxy)
 
-            for kys in first_keys:
-                if kys in opts[i + 1].keys():
-                    if opts[min_index][kys] == opts[i + 1][kys]:
-                        samesies.update({kys: opts[min_index][kys]})
 
-    always = {}
-    for k, v in samesies.items():
-        always[k] = v
+def create_matches(options: List[BaseOptions]) -> Dict:
+    opts = [opt.to_capabilities() for opt in options]
 
-    for i in opts:
-        for k in always:
-            del i[k]
+    # Capabilities present with the same value in every options object. Values can be
+    # dicts, so items are compared by equality rather than intersected as sets; see
+    # https://bugs.python.org/issue38210
+    always = dict(opts[0]) if opts else {}
+    for opt in opts[1:]:
+        always = {k: v for k, v in always.items() if k in opt and opt[k] == v}
 
-    capabilities["capabilities"]["alwaysMatch"] = always
-    capabilities["capabilities"]["firstMatch"] = opts
+    first_match = [{k: v for k, v in opt.items() if k not in always} for opt in opts]
 
-    return capabilities
+    return {"capabilities": {"alwaysMatch": always, "firstMatch": first_match}}
 
 
 class BaseWebDriver(metaclass=ABCMeta):
@@ -186,8 +169,13 @@ class WebDriver(BaseWebDriver):
         """
 
         if isinstance(options, list):
-            capabilities = create_matches(options)
-            _ignore_local_proxy = False
+            if len(options) == 1:
+                # Nothing to split between alwaysMatch and firstMatch
+                capabilities = {"capabilities": {"alwaysMatch": options[0].to_capabilities(), "firstMatch": [{}]}}
+                _ignore_local_proxy = options[0]._ignore_local_proxy
+            else:
+                capabilities = create_matches(options)
+                _ignore_local_proxy = False
         else:
             capabilities = options.to_capabilities()
             _ignore_local_proxy = options._ignore_local_proxy